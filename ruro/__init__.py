@@ -20,9 +20,33 @@ try:
         BaseIterableEntry,
         BaseIterablePipeline,
         BaseIterableExit,
+        BaseComposed,
+        ComposedEntry,
+        ComposedPipeline,
+        ComposedExit,
+        StageStats,
+        StageIterator,
+        StageHints,
+    )
+    from .basics import (
+        Constant,
+        IterableConstant,
+        Exec,
+        Map,
+        Filter,
+        Sum,
+        Product,
+        Concat,
+    )
+    from . import (
+        columnar,
+        debug,
+        decorators,
+        planner,
+        serialization,
+        spill,
+        tracing,
     )
-    from .basics import Constant, IterableConstant, Exec, Map, Filter, Sum
-    from . import decorators
 
     __all__ = [
         "Entry",
@@ -38,12 +62,27 @@ try:
         "BaseIterableEntry",
         "BaseIterablePipeline",
         "BaseIterableExit",
+        "BaseComposed",
+        "ComposedEntry",
+        "ComposedPipeline",
+        "ComposedExit",
+        "StageStats",
+        "StageIterator",
+        "StageHints",
         "Constant",
         "Exec",
         "Map",
         "Filter",
         "Sum",
+        "Product",
+        "Concat",
+        "columnar",
+        "debug",
         "decorators",
+        "planner",
+        "serialization",
+        "spill",
+        "tracing",
     ]
 except ImportError:
     pass
@@ -1,17 +1,73 @@
 from __future__ import annotations
 
+import os
+import warnings
 from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from time import perf_counter
+from traceback import FrameSummary, extract_stack, format_list
 from types import TracebackType
-from typing import TypeVar, Generic, Type, Union, Optional, Literal, overload, cast
-
-from collections.abc import Callable, Iterable, Iterator
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    TypeVar,
+    Generic,
+    Type,
+    Union,
+    Optional,
+    Literal,
+    overload,
+    cast,
+)
+
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from contextlib import AbstractContextManager
 
+if TYPE_CHECKING:
+    from ruro.tracing import Sampler
+
 
 S = TypeVar("S")
 T = TypeVar("T")
 U = TypeVar("U")
 
+_LEAK_DETECTION = os.environ.get("RURO_DEBUG_LEAKS") not in (None, "", "0")
+_SAMPLER: Optional[Sampler] = None
+
+
+@dataclass(frozen=True)
+class StageHints:
+    pure: bool = False
+    cost: Optional[float] = None
+    vectorized: bool = False
+    batch_size: Optional[int] = None
+    fuse: bool = False
+
+    def __post_init__(self) -> None:
+        if self.cost is not None and self.cost < 0:
+            raise ValueError("cost must be non-negative")
+        if self.pure and self.vectorized:
+            raise ValueError("pure cannot be combined with vectorized=True")
+        if self.batch_size is not None:
+            if not self.vectorized:
+                raise ValueError("batch_size requires vectorized=True")
+            if self.batch_size <= 0:
+                raise ValueError("batch_size must be positive")
+
+    def _describe(self) -> str:
+        fields = []
+        if self.pure:
+            fields.append("pure")
+        if self.cost is not None:
+            fields.append(f"cost={self.cost:g}")
+        if self.vectorized:
+            fields.append("vectorized")
+        if self.batch_size is not None:
+            fields.append(f"batch_size={self.batch_size}")
+        if self.fuse:
+            fields.append("fuse")
+        return ", ".join(fields)
+
 
 class BaseCallContext(AbstractContextManager[None], Generic[S, T]):
     def __init__(self, obj: Base[S, T]):
@@ -56,16 +112,45 @@ class Base(Generic[S, T], metaclass=ABCMeta):
     def _computed(self, arg: T) -> None:
         return None
 
+    _hints = StageHints()
+    _traced = True
+
+    @property
+    def hints(self) -> StageHints:
+        return self._hints
+
+    @property
+    def stages(self) -> tuple[Base[Any, Any], ...]:
+        return (self,)
+
+    def _describe(self) -> str:
+        func = getattr(self, "_func", None)
+        name = getattr(func, "__qualname__", None) or getattr(func, "__name__", "")
+        hints = self._hints._describe()
+        if hints:
+            return f"{self.__class__.__name__}({name}) [{hints}]"
+        return f"{self.__class__.__name__}({name})"
+
 
 class BaseZeroArg(Base[None, T], metaclass=ABCMeta):
     def _before(self) -> None:
         return None
 
     def __call__(self) -> T:
-        with self._exec_context():
-            retval = self._exec()
-            self._computed(retval)
-            return retval
+        sampler = _SAMPLER
+        if sampler is None or not sampler.sample(self):
+            with self._exec_context():
+                retval = self._exec()
+                self._computed(retval)
+                return retval
+        start = perf_counter()
+        try:
+            with self._exec_context():
+                retval = self._exec()
+                self._computed(retval)
+                return retval
+        finally:
+            sampler.record(self, perf_counter() - start)
 
     def _exec_context(self) -> ZeroArgCallContext[T]:
         return ZeroArgCallContext(self)
@@ -80,10 +165,20 @@ class BaseOneArg(Base[S, T], metaclass=ABCMeta):
         return None
 
     def __call__(self, arg: S) -> T:
-        with self._exec_context(arg):
-            retval = self._exec(arg)
-            self._computed(retval)
-            return retval
+        sampler = _SAMPLER
+        if sampler is None or not sampler.sample(self):
+            with self._exec_context(arg):
+                retval = self._exec(arg)
+                self._computed(retval)
+                return retval
+        start = perf_counter()
+        try:
+            with self._exec_context(arg):
+                retval = self._exec(arg)
+                self._computed(retval)
+                return retval
+        finally:
+            sampler.record(self, perf_counter() - start)
 
     def _exec_context(self, arg: S) -> OneArgCallContext[S, T]:
         return OneArgCallContext(self, arg)
@@ -93,42 +188,152 @@ class BaseOneArg(Base[S, T], metaclass=ABCMeta):
         ...
 
 
+def _close(obj: Any) -> None:
+    close = getattr(obj, "close", None)
+    if callable(close):
+        close()
+
+
+class _CloseRequested(GeneratorExit):
+    pass
+
+
+class StageIterator(Iterator[T]):
+    __slots__ = ("_generator", "_upstream", "_closed")
+
+    def __init__(self, generator: Generator[T, None, None], upstream: Any = None):
+        self._generator = generator
+        self._upstream = upstream
+        self._closed = False
+
+    def __iter__(self) -> Iterator[T]:
+        return self._generator
+
+    def __next__(self) -> T:
+        return next(self._generator)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # Unlike generator.close(), this tells the generator that the close
+            # was requested, so it may close the iterator its stage produced.
+            self._generator.throw(_CloseRequested)
+        except (_CloseRequested, StopIteration):
+            pass
+        finally:
+            upstream, self._upstream = self._upstream, None
+            _close(upstream)
+
+    def __enter__(self) -> StageIterator[T]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        excinst: Optional[BaseException],
+        exctb: Optional[TracebackType],
+    ) -> Literal[False]:
+        self.close()
+        return False
+
+
+class _TrackedStageIterator(StageIterator[T]):
+    __slots__ = ("_exhausted", "_created_at")
+
+    def __init__(self, generator: Generator[T, None, None], upstream: Any = None):
+        super(_TrackedStageIterator, self).__init__(generator, upstream)
+        self._exhausted = False
+        self._created_at: list[FrameSummary] = extract_stack()[:-2]
+
+    def __iter__(self) -> Iterator[T]:
+        return self
+
+    def __next__(self) -> T:
+        try:
+            return next(self._generator)
+        except StopIteration:
+            self._exhausted = True
+            raise
+
+    def __del__(self) -> None:
+        if self._closed or self._exhausted:
+            return
+        warnings.warn(
+            "unclosed iterable stage created at (most recent call last):\n"
+            + "".join(format_list(self._created_at)),
+            ResourceWarning,
+            source=self,
+        )
+        self.close()
+
+
 class BaseIterable(Base[S, Iterable[T]]):
     def _each(self, arg: T, index: int) -> None:
         return None
 
 
 class BaseZeroArgIterable(BaseZeroArg[Iterable[T]], BaseIterable[None, T]):
-    def __call__(self) -> Iterable[T]:
+    def __call__(self) -> StageIterator[T]:
+        if _LEAK_DETECTION:
+            return _TrackedStageIterator(self._generate())
+        return StageIterator(self._generate())
+
+    def _generate(self) -> Generator[T, None, None]:
         with self._exec_context():
             retval = self._exec()
             self._computed(retval)
-            for i, d in enumerate(retval):
-                self._each(d, i)
-                yield d
+            try:
+                sampler = _SAMPLER
+                items = retval if sampler is None else sampler.items(self, retval)
+                for i, d in enumerate(items):
+                    self._each(d, i)
+                    yield d
+            except _CloseRequested:
+                if isinstance(retval, Iterator):
+                    _close(retval)
+                raise
 
 
 class BaseOneArgIterable(BaseOneArg[S, Iterable[T]], BaseIterable[S, T]):
-    def __call__(self, arg: S) -> Iterable[T]:
+    def __call__(self, arg: S) -> StageIterator[T]:
+        if _LEAK_DETECTION:
+            return _TrackedStageIterator(self._generate(arg))
+        return StageIterator(self._generate(arg))
+
+    def _generate(self, arg: S) -> Generator[T, None, None]:
         with self._exec_context(arg):
             retval = self._exec(arg)
             self._computed(retval)
-            for i, d in enumerate(retval):
-                self._each(d, i)
-                yield d
+            try:
+                sampler = _SAMPLER
+                items = retval if sampler is None else sampler.items(self, retval)
+                for i, d in enumerate(items):
+                    self._each(d, i)
+                    yield d
+            except _CloseRequested:
+                if isinstance(retval, Iterator):
+                    _close(retval)
+                raise
 
 
 class BaseExit(BaseOneArg[S, T]):
     def _prepend_pipeline(self, pipeline: BasePipeline[U, S]) -> BaseExit[U, T]:
-        def _(arg: U) -> T:
-            return self(pipeline(arg))
-
-        return Exit[U, T](_)
+        return ComposedExit[U, T](pipeline.stages + self.stages)
 
 
 class Exit(BaseExit[S, T]):
-    def __init__(self, func: Callable[[S], T]) -> None:
+    def __init__(
+        self, func: Callable[[S], T], hints: Optional[StageHints] = None
+    ) -> None:
         self._func = func
+        if hints is not None:
+            self._hints = hints
 
     def _exec(self, arg: S) -> T:
         return self._func(arg)
@@ -136,10 +341,7 @@ class Exit(BaseExit[S, T]):
 
 class BasePipeline(BaseOneArg[S, T]):
     def _append_pipeline(self, pipeline: BasePipeline[T, U]) -> BasePipeline[S, U]:
-        def _(arg: S) -> U:
-            return pipeline(self(arg))
-
-        return Pipeline[S, U](_)
+        return ComposedPipeline[S, U](self.stages + pipeline.stages)
 
     @overload
     def __or__(self, other: BasePipeline[T, U]) -> BasePipeline[S, U]:
@@ -162,8 +364,12 @@ class BasePipeline(BaseOneArg[S, T]):
 
 
 class Pipeline(BasePipeline[S, T]):
-    def __init__(self, func: Callable[[S], T]) -> None:
+    def __init__(
+        self, func: Callable[[S], T], hints: Optional[StageHints] = None
+    ) -> None:
         self._func = func
+        if hints is not None:
+            self._hints = hints
 
     def _exec(self, arg: S) -> T:
         return self._func(arg)
@@ -171,10 +377,7 @@ class Pipeline(BasePipeline[S, T]):
 
 class BaseEntry(BaseZeroArg[T], metaclass=ABCMeta):
     def _append_pipeline(self, pipeline: BasePipeline[T, U]) -> BaseEntry[U]:
-        def _() -> U:
-            return pipeline(self())
-
-        return Entry[U](_)
+        return ComposedEntry[U](self.stages + pipeline.stages)
 
     @overload
     def __or__(self, other: BasePipeline[T, U]) -> BaseEntry[U]:
@@ -197,8 +400,12 @@ class BaseEntry(BaseZeroArg[T], metaclass=ABCMeta):
 
 
 class Entry(BaseEntry[T]):
-    def __init__(self, func: Callable[[], T]) -> None:
+    def __init__(
+        self, func: Callable[[], T], hints: Optional[StageHints] = None
+    ) -> None:
         self._func = func
+        if hints is not None:
+            self._hints = hints
 
     def _exec(self) -> T:
         return self._func()
@@ -230,3 +437,232 @@ class IterablePipeline(BaseIterablePipeline[S, T], Pipeline[S, Iterable[T]]):
 
 class IterableEntry(BaseIterableEntry[T], Entry[Iterable[T]]):
     pass
+
+
+@dataclass(frozen=True)
+class StageStats:
+    calls: int
+    items_in: Optional[int]
+    items_out: Optional[int]
+    elapsed: float
+
+    @property
+    def selectivity(self) -> Optional[float]:
+        if self.items_in is None or self.items_out is None or self.items_in == 0:
+            return None
+        return self.items_out / self.items_in
+
+
+class _StageCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.items_out: Optional[int] = None
+        self.inclusive = 0.0
+        self.lazy = False
+
+    def measure(self, stage: Callable[..., Any], *args: Any) -> Any:
+        start = perf_counter()
+        try:
+            retval = stage(*args)
+        finally:
+            self.inclusive += perf_counter() - start
+        self.calls += 1
+        if isinstance(retval, Iterator):
+            self.lazy = True
+            self.items_out = self.items_out or 0
+            return _StageProbe(retval, self)
+        if isinstance(retval, (list, tuple)):
+            self.items_out = (self.items_out or 0) + len(retval)
+        return retval
+
+
+class _StageProbe(Iterator[T], AbstractContextManager["_StageProbe[T]"]):
+    def __init__(self, iterator: Iterator[T], counter: _StageCounter) -> None:
+        self._iterator = iterator
+        self._counter = counter
+
+    def __next__(self) -> T:
+        start = perf_counter()
+        try:
+            retval = next(self._iterator)
+        finally:
+            self._counter.inclusive += perf_counter() - start
+        self._counter.items_out = cast(int, self._counter.items_out) + 1
+        return retval
+
+    def close(self) -> None:
+        _close(self._iterator)
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        excinst: Optional[BaseException],
+        exctb: Optional[TracebackType],
+    ) -> Literal[False]:
+        self.close()
+        return False
+
+
+def _link(iterator: Iterator[Any], upstream: Any) -> None:
+    if isinstance(iterator, StageIterator) and isinstance(
+        upstream, (StageIterator, _StageProbe)
+    ):
+        iterator._upstream = upstream
+
+
+class BaseComposed(Base[S, T]):
+    _traced = False
+
+    def __init__(
+        self,
+        stages: Sequence[Base[Any, Any]],
+        origins: Optional[Sequence[int]] = None,
+    ) -> None:
+        self._stages = tuple(stages)
+        self._origins = tuple(range(len(self._stages)) if origins is None else origins)
+        if len(self._origins) != len(self._stages):
+            raise ValueError("origins must have the same length as stages")
+        self._callables = cast(tuple[Callable[..., Any], ...], self._stages)
+        self._counters: Optional[tuple[_StageCounter, ...]] = None
+
+    @property
+    def stages(self) -> tuple[Base[Any, Any], ...]:
+        return self._stages
+
+    @property
+    def origins(self) -> tuple[int, ...]:
+        return self._origins
+
+    def _rebuild(
+        self, stages: Sequence[Base[Any, Any]], origins: Sequence[int]
+    ) -> BaseComposed[S, T]:
+        return self.__class__(stages, origins)
+
+    def collect_stats(self, enabled: bool = True) -> None:
+        self._counters = (
+            tuple(_StageCounter() for _ in self._stages) if enabled else None
+        )
+
+    @property
+    def stats(self) -> Optional[tuple[StageStats, ...]]:
+        if self._counters is None:
+            return None
+        retval = []
+        previous: Optional[_StageCounter] = None
+        for counter in self._counters:
+            items_in = None
+            elapsed = counter.inclusive
+            if previous is not None:
+                items_in = previous.items_out
+                if previous.lazy:
+                    elapsed -= previous.inclusive
+            retval.append(
+                StageStats(
+                    calls=counter.calls,
+                    items_in=items_in,
+                    items_out=counter.items_out,
+                    elapsed=max(elapsed, 0.0),
+                )
+            )
+            previous = counter
+        return tuple(retval)
+
+    def _run(self, value: Any, start: int) -> Any:
+        # Closing a stage iterator closes the iterators it consumes, but only
+        # those produced inside this composite; the caller's argument is theirs.
+        owned = start > 0
+        if self._counters is None:
+            for stage in self._callables[start:]:
+                retval = stage(value)
+                if owned and isinstance(retval, StageIterator):
+                    _link(retval, value)
+                value = retval
+                owned = True
+            return value
+        for stage, counter in zip(self._callables[start:], self._counters[start:]):
+            retval = counter.measure(stage, value)
+            if owned and isinstance(retval, _StageProbe):
+                _link(retval._iterator, value)
+            value = retval
+            owned = True
+        return value
+
+    def _plan(self) -> list[tuple[str, str]]:
+        stats = self.stats
+        retval = []
+        for index, (stage, origin) in enumerate(zip(self._stages, self._origins)):
+            details = [_stage_kind(stage), _stage_shape(stage)]
+            if stats is not None:
+                details.append(_format_stats(stats[index]))
+            if origin != index:
+                details.append(f"moved from {origin}")
+            retval.append((stage._describe(), ", ".join(details)))
+        return retval
+
+    def explain(self) -> str:
+        lines = [self.__class__.__name__]
+        for index, (description, details) in enumerate(self._plan()):
+            lines.append(f"  {index}: {description}  ({details})")
+        return "\n".join(lines)
+
+    def to_dot(self) -> str:
+        stats = self.stats
+        lines = [f"digraph {self.__class__.__name__} {{", "  rankdir=LR;"]
+        for index, (description, details) in enumerate(self._plan()):
+            label = _dot_escape(f"{index}: {description}\n{details}")
+            lines.append(f'  s{index} [shape=box, label="{label}"];')
+        for index in range(1, len(self._stages)):
+            edge = f"  s{index - 1} -> s{index}"
+            if stats is not None and stats[index].items_in is not None:
+                edge += f' [label="{stats[index].items_in}"]'
+            lines.append(edge + ";")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def _stage_kind(stage: Base[Any, Any]) -> str:
+    if isinstance(stage, BaseEntry):
+        return "entry"
+    if isinstance(stage, BasePipeline):
+        return "pipeline"
+    if isinstance(stage, BaseExit):
+        return "exit"
+    return "stage"
+
+
+def _stage_shape(stage: Base[Any, Any]) -> str:
+    return "iterable" if isinstance(stage, BaseIterable) else "scalar"
+
+
+def _format_stats(stats: StageStats) -> str:
+    fields = [f"calls={stats.calls}"]
+    if stats.items_in is not None:
+        fields.append(f"in={stats.items_in}")
+    if stats.items_out is not None:
+        fields.append(f"out={stats.items_out}")
+    if stats.selectivity is not None:
+        fields.append(f"selectivity={stats.selectivity:.3f}")
+    fields.append(f"time={stats.elapsed * 1000:.3f}ms")
+    return " ".join(fields)
+
+
+def _dot_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ComposedEntry(BaseComposed[None, T], Entry[T]):
+    def _exec(self) -> T:
+        head = cast(BaseZeroArg[Any], self._stages[0])
+        if self._counters is None:
+            return cast(T, self._run(head(), 1))
+        return cast(T, self._run(self._counters[0].measure(head), 1))
+
+
+class ComposedPipeline(BaseComposed[S, T], Pipeline[S, T]):
+    def _exec(self, arg: S) -> T:
+        return cast(T, self._run(arg, 0))
+
+
+class ComposedExit(BaseComposed[S, T], Exit[S, T]):
+    def _exec(self, arg: S) -> T:
+        return cast(T, self._run(arg, 0))
@@ -1,5 +1,7 @@
-from collections.abc import Callable, Iterable
-from typing import Union, cast, overload, Optional
+from collections.abc import Callable, Collection, Iterable
+from itertools import chain
+from math import fsum, prod
+from typing import Any, Union, cast, overload, Optional
 
 from ruro.base import (
     BaseEntry,
@@ -41,16 +43,113 @@ class Map(BaseIterablePipeline[Iterable[S], T]):
 
 
 class Filter(BaseIterablePipeline[Iterable[S], S]):
-    def __init__(self, func: Callable[[S], bool]):
+    def __init__(
+        self,
+        func: Callable[[S], bool],
+        cost: Optional[float] = None,
+        selectivity: Optional[float] = None,
+        depends_on: Collection["Filter[Any]"] = (),
+    ):
+        if cost is not None and cost < 0:
+            raise ValueError("cost must be non-negative")
+        if selectivity is not None and not 0.0 <= selectivity <= 1.0:
+            raise ValueError("selectivity must be between 0 and 1")
         self._func = func
+        self._cost = cost
+        self._selectivity = selectivity
+        self._depends_on = tuple(depends_on)
+
+    @property
+    def cost(self) -> Optional[float]:
+        return self._cost
+
+    @property
+    def selectivity(self) -> Optional[float]:
+        return self._selectivity
+
+    @property
+    def depends_on(self) -> tuple["Filter[Any]", ...]:
+        return self._depends_on
+
+    def _describe(self) -> str:
+        annotations = []
+        if self._cost is not None:
+            annotations.append(f"cost={self._cost:g}")
+        if self._selectivity is not None:
+            annotations.append(f"selectivity={self._selectivity:g}")
+        description = super(Filter, self)._describe()
+        if annotations:
+            description += " [" + ", ".join(annotations) + "]"
+        return description
 
     def _exec(self, arg: Iterable[S]) -> Iterable[S]:
         return filter(self._func, arg)
 
 
+def _sequences(arg: Iterable[Any]) -> Iterable[Any]:
+    for d in arg:
+        if not isinstance(d, (list, tuple)):
+            raise TypeError(
+                f"can only concatenate list or tuple items (not '{type(d).__name__}')"
+            )
+        yield d
+
+
+def _concat(initial_value: Any, arg: Iterable[Any]) -> Any:
+    if isinstance(initial_value, str):
+        return initial_value + "".join(arg)
+    if isinstance(initial_value, (bytes, bytearray)):
+        return initial_value + b"".join(arg)
+    if isinstance(initial_value, tuple):
+        return initial_value + tuple(chain.from_iterable(_sequences(arg)))
+    if not isinstance(initial_value, list):
+        raise TypeError(
+            "can only concatenate str, bytes, list or tuple"
+            f" (not '{type(initial_value).__name__}')"
+        )
+    retval = list(initial_value)
+    retval.extend(chain.from_iterable(_sequences(arg)))
+    return retval
+
+
 class Sum(BasePipeline[Iterable[S], S]):
-    def __init__(self, initial_value: Optional[Union[S, int]] = 0):
+    def __init__(
+        self,
+        initial_value: Optional[Union[S, int]] = 0,
+        precise: bool = False,
+    ):
+        self._initial_value = initial_value
+        self._precise = precise
+
+    def _exec(self, arg: Iterable[S]) -> S:
+        if self._precise:
+            floats = chain((self._initial_value,), arg)
+            return cast(S, fsum(cast(Iterable[float], floats)))
+        if isinstance(self._initial_value, (str, bytes, bytearray, list, tuple)):
+            return cast(S, _concat(self._initial_value, arg))
+        values = cast(Iterable[Any], arg)
+        start: Any = self._initial_value
+        return cast(S, sum(values, start))
+
+
+class Product(BasePipeline[Iterable[S], S]):
+    def __init__(self, initial_value: Optional[Union[S, int]] = 1):
+        self._initial_value = initial_value
+
+    def _exec(self, arg: Iterable[S]) -> S:
+        values = cast(Iterable[Any], arg)
+        start: Any = self._initial_value
+        return cast(S, prod(values, start=start))
+
+
+class Concat(BasePipeline[Iterable[S], S]):
+    def __init__(self, initial_value: Optional[S] = None):
         self._initial_value = initial_value
 
     def _exec(self, arg: Iterable[S]) -> S:
-        return cast(S, sum(arg, self._initial_value))
+        if self._initial_value is not None:
+            return cast(S, _concat(self._initial_value, arg))
+        iterator = iter(arg)
+        for first in iterator:
+            return cast(S, _concat(first, iterator))
+        return cast(S, [])
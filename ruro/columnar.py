@@ -0,0 +1,121 @@
+from array import array
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from itertools import compress, islice
+from typing import Any, Optional
+
+from ruro.base import BaseIterablePipeline
+
+
+Batch = dict[str, Any]
+
+
+def _column_length(batch: Batch) -> int:
+    for column in batch.values():
+        return len(column)
+    return 0
+
+
+def _take(column: Any, mask: Sequence[bool]) -> Any:
+    if isinstance(column, list):
+        return list(compress(column, mask))
+    if isinstance(column, array):
+        return array(column.typecode, compress(column, mask))
+    return column[mask]
+
+
+def _apply(column: Any, func: Callable[[Any], Any]) -> Any:
+    if isinstance(column, array):
+        values = list(map(func, column))
+        try:
+            return array(column.typecode, values)
+        except (TypeError, OverflowError):
+            return values
+    return list(map(func, column))
+
+
+def _columns(rows: list[Mapping[str, Any]]) -> Batch:
+    keys = rows[0].keys()
+    for row in rows:
+        if row.keys() != keys:
+            raise ValueError(
+                f"rows in a batch must have the same keys, got {sorted(keys)}"
+                f" and {sorted(row.keys())}"
+            )
+    return {key: [row[key] for row in rows] for key in keys}
+
+
+class FromRows(BaseIterablePipeline[Iterable[Mapping[str, Any]], Batch]):
+    def __init__(self, batch_size: int):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self._batch_size = batch_size
+
+    def _exec(self, arg: Iterable[Mapping[str, Any]]) -> Iterable[Batch]:
+        iterator = iter(arg)
+        while True:
+            rows = list(islice(iterator, self._batch_size))
+            if not rows:
+                return
+            yield _columns(rows)
+
+
+class ToRows(BaseIterablePipeline[Iterable[Batch], dict[str, Any]]):
+    def __init__(self) -> None:
+        pass
+
+    def _exec(self, arg: Iterable[Batch]) -> Iterable[dict[str, Any]]:
+        for batch in arg:
+            keys = list(batch)
+            for values in zip(*(batch[key] for key in keys)):
+                yield dict(zip(keys, values))
+
+
+class Select(BaseIterablePipeline[Iterable[Batch], Batch]):
+    def __init__(self, cols: Iterable[str]):
+        self._cols = tuple(cols)
+
+    def _select(self, batch: Batch) -> Batch:
+        return {col: batch[col] for col in self._cols}
+
+    def _exec(self, arg: Iterable[Batch]) -> Iterable[Batch]:
+        return map(self._select, arg)
+
+
+class MapColumn(BaseIterablePipeline[Iterable[Batch], Batch]):
+    def __init__(
+        self,
+        col: str,
+        func: Callable[[Any], Any],
+        output: Optional[str] = None,
+        vectorized: bool = False,
+    ):
+        self._col = col
+        self._func = func
+        self._output = col if output is None else output
+        self._vectorized = vectorized
+
+    def _map_column(self, batch: Batch) -> Batch:
+        column = batch[self._col]
+        retval = dict(batch)
+        if self._vectorized:
+            retval[self._output] = self._func(column)
+        else:
+            retval[self._output] = _apply(column, self._func)
+        return retval
+
+    def _exec(self, arg: Iterable[Batch]) -> Iterable[Batch]:
+        return map(self._map_column, arg)
+
+
+class FilterRows(BaseIterablePipeline[Iterable[Batch], Batch]):
+    def __init__(self, mask_func: Callable[[Batch], Sequence[bool]]):
+        self._func = mask_func
+
+    def _exec(self, arg: Iterable[Batch]) -> Iterable[Batch]:
+        for batch in arg:
+            mask = self._func(batch)
+            if len(mask) != _column_length(batch):
+                raise ValueError("mask length does not match the batch length")
+            filtered = {key: _take(column, mask) for key, column in batch.items()}
+            if _column_length(filtered) > 0:
+                yield filtered
@@ -0,0 +1,9 @@
+from ruro import base
+
+
+def enable_leak_detection(enabled: bool = True) -> None:
+    base._LEAK_DETECTION = enabled
+
+
+def leak_detection_enabled() -> bool:
+    return base._LEAK_DETECTION
@@ -1,15 +1,158 @@
-from ruro.base import Entry, Pipeline, Exit, S, T
+from ruro.base import (
+    Entry,
+    Pipeline,
+    Exit,
+    IterablePipeline,
+    StageHints,
+    S,
+    T,
+)
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+from functools import lru_cache, wraps
+from itertools import islice
+from typing import Any, Optional, Union, overload
 
 
+MEMO_SIZE = 1024
+DEFAULT_BATCH_SIZE = 1024
+
+
+class _Uncached(Exception):
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+def _memoize(func: Callable[..., T]) -> Callable[..., T]:
+    def _call(*args: Any) -> T:
+        retval = func(*args)
+        if isinstance(retval, Iterator):
+            raise _Uncached(retval)
+        return retval
+
+    cached = lru_cache(maxsize=MEMO_SIZE, typed=True)(_call)
+
+    @wraps(func)
+    def _(*args: Any) -> T:
+        if any(isinstance(d, Iterator) for d in args):
+            return func(*args)
+        try:
+            hash(args)
+        except TypeError:
+            return func(*args)
+        try:
+            return cached(*args)
+        except _Uncached as uncached:
+            return uncached.value  # type: ignore[no-any-return]
+
+    return _
+
+
+def _batched(
+    func: Callable[[list[S]], Iterable[T]], batch_size: int
+) -> Callable[[Iterable[S]], Iterable[T]]:
+    @wraps(func)
+    def _(arg: Iterable[S]) -> Iterable[T]:
+        iterator = iter(arg)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield from func(batch)
+
+    return _
+
+
+@overload
 def entry(func: Callable[[], T]) -> Entry[T]:
-    return Entry[T](func)
+    ...
+
+
+@overload
+def entry(
+    *, pure: bool = ..., cost: Optional[float] = ...
+) -> Callable[[Callable[[], T]], Entry[T]]:
+    ...
+
 
+def entry(
+    func: Optional[Callable[[], T]] = None,
+    *,
+    pure: bool = False,
+    cost: Optional[float] = None,
+) -> Union[Entry[T], Callable[[Callable[[], T]], Entry[T]]]:
+    hints = StageHints(pure=pure, cost=cost)
 
+    def _(func: Callable[[], T]) -> Entry[T]:
+        return Entry[T](_memoize(func) if pure else func, hints)
+
+    return _ if func is None else _(func)
+
+
+@overload
 def pipeline(func: Callable[[S], T]) -> Pipeline[S, T]:
-    return Pipeline[S, T](func)
+    ...
+
+
+@overload
+def pipeline(
+    *,
+    pure: bool = ...,
+    cost: Optional[float] = ...,
+    vectorized: bool = ...,
+    batch_size: Optional[int] = ...,
+    fuse: bool = ...,
+) -> Callable[[Callable[[S], T]], Pipeline[S, T]]:
+    ...
+
+
+def pipeline(
+    func: Optional[Callable[[S], T]] = None,
+    *,
+    pure: bool = False,
+    cost: Optional[float] = None,
+    vectorized: bool = False,
+    batch_size: Optional[int] = None,
+    fuse: bool = False,
+) -> Union[Pipeline[S, T], Callable[[Callable[[S], T]], Pipeline[S, T]]]:
+    hints = StageHints(
+        pure=pure, cost=cost, vectorized=vectorized, batch_size=batch_size, fuse=fuse
+    )
+
+    def _(func: Callable[[S], T]) -> Pipeline[S, T]:
+        if pure:
+            func = _memoize(func)
+        if vectorized:
+            return IterablePipeline[Any, Any](
+                _batched(func, batch_size or DEFAULT_BATCH_SIZE),  # type: ignore
+                hints,
+            )
+        return Pipeline[S, T](func, hints)
 
+    return _ if func is None else _(func)
 
+
+@overload
 def exit(func: Callable[[S], T]) -> Exit[S, T]:
-    return Exit[S, T](func)
+    ...
+
+
+@overload
+def exit(
+    *, pure: bool = ..., cost: Optional[float] = ...
+) -> Callable[[Callable[[S], T]], Exit[S, T]]:
+    ...
+
+
+def exit(
+    func: Optional[Callable[[S], T]] = None,
+    *,
+    pure: bool = False,
+    cost: Optional[float] = None,
+) -> Union[Exit[S, T], Callable[[Callable[[S], T]], Exit[S, T]]]:
+    hints = StageHints(pure=pure, cost=cost)
+
+    def _(func: Callable[[S], T]) -> Exit[S, T]:
+        return Exit[S, T](_memoize(func) if pure else func, hints)
+
+    return _ if func is None else _(func)
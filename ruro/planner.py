@@ -0,0 +1,136 @@
+from collections.abc import Callable, Sequence
+from typing import Any, Optional, TypeVar
+
+from ruro.base import Base, BaseComposed, Pipeline, StageHints, StageStats
+from ruro.basics import Filter
+
+
+DEFAULT_COST = 1.0
+DEFAULT_SELECTIVITY = 0.5
+
+C = TypeVar("C", bound=Base[Any, Any])
+
+
+def rank(cost: float, selectivity: float) -> float:
+    if selectivity >= 1.0:
+        return float("inf")
+    return cost / (1.0 - selectivity)
+
+
+def estimate(
+    stage: Filter[Any], stats: Optional[StageStats] = None
+) -> tuple[float, float]:
+    cost = stage.cost
+    selectivity = stage.selectivity
+    if stats is not None and stats.items_in:
+        if cost is None:
+            cost = stats.elapsed / stats.items_in
+        if selectivity is None:
+            selectivity = stats.selectivity
+    return (
+        DEFAULT_COST if cost is None else cost,
+        DEFAULT_SELECTIVITY if selectivity is None else selectivity,
+    )
+
+
+def _order_run(
+    run: dict[int, Filter[Any]], stats: Optional[Sequence[StageStats]]
+) -> list[int]:
+    ranks: dict[int, float] = {}
+    for index, stage in run.items():
+        ranks[index] = rank(*estimate(stage, None if stats is None else stats[index]))
+    position = {id(stage): index for index, stage in run.items()}
+    pending = list(run)
+    retval: list[int] = []
+    while pending:
+        ready = [
+            index
+            for index in pending
+            if all(
+                position.get(id(dependency)) not in pending
+                for dependency in run[index].depends_on
+            )
+        ]
+        if not ready:
+            raise ValueError("filters have circular depends_on")
+        chosen = min(ready, key=lambda index: ranks[index])
+        pending.remove(chosen)
+        retval.append(chosen)
+    return retval
+
+
+def reorder(pipeline: C) -> C:
+    if not isinstance(pipeline, BaseComposed):
+        return pipeline
+    stages = pipeline.stages
+    stats = pipeline.stats
+    order: list[int] = []
+    run: dict[int, Filter[Any]] = {}
+    for index, stage in enumerate(stages):
+        if isinstance(stage, Filter):
+            run[index] = stage
+            continue
+        order.extend(_order_run(run, stats))
+        run = {}
+        order.append(index)
+    order.extend(_order_run(run, stats))
+    if order == list(range(len(stages))):
+        return pipeline
+    origins = pipeline.origins
+    return pipeline._rebuild(  # type: ignore[return-value]
+        [stages[index] for index in order], [origins[index] for index in order]
+    )
+
+
+def _fusable(stage: Base[Any, Any]) -> bool:
+    return type(stage) is Pipeline and stage.hints.fuse
+
+
+def _compose(funcs: Sequence[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    def _(arg: Any) -> Any:
+        for func in funcs:
+            arg = func(arg)
+        return arg
+
+    _.__qualname__ = _.__name__ = " | ".join(
+        getattr(func, "__qualname__", repr(func)) for func in funcs
+    )
+    return _
+
+
+def _fused(group: Sequence[Pipeline[Any, Any]]) -> Pipeline[Any, Any]:
+    costs = [stage.hints.cost for stage in group]
+    hints = StageHints(
+        pure=all(stage.hints.pure for stage in group),
+        cost=None if None in costs else sum(costs),  # type: ignore[arg-type]
+        fuse=True,
+    )
+    return Pipeline[Any, Any](_compose([stage._func for stage in group]), hints)
+
+
+def fuse(pipeline: C) -> C:
+    if not isinstance(pipeline, BaseComposed):
+        return pipeline
+    stages: list[Base[Any, Any]] = []
+    origins: list[int] = []
+    group: list[Pipeline[Any, Any]] = []
+    for stage, origin in zip(pipeline.stages, pipeline.origins):
+        if _fusable(stage):
+            if not group:
+                origins.append(origin)
+            group.append(stage)  # type: ignore[arg-type]
+            continue
+        if group:
+            stages.append(group[0] if len(group) == 1 else _fused(group))
+            group = []
+        stages.append(stage)
+        origins.append(origin)
+    if group:
+        stages.append(group[0] if len(group) == 1 else _fused(group))
+    if len(stages) == len(pipeline.stages):
+        return pipeline
+    return pipeline._rebuild(stages, origins)  # type: ignore[return-value]
+
+
+def optimize(pipeline: C) -> C:
+    return fuse(reorder(pipeline))
@@ -0,0 +1,360 @@
+import base64
+import hashlib
+import json
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Optional
+
+from ruro import basics, columnar, spill
+from ruro.base import (
+    Base,
+    BaseComposed,
+    ComposedEntry,
+    ComposedExit,
+    ComposedPipeline,
+    Entry,
+    Exit,
+    IterableEntry,
+    IterableExit,
+    IterablePipeline,
+    Pipeline,
+    StageHints,
+)
+
+
+FORMAT_VERSION = 1
+CACHE_SIZE = 256
+
+Encoder = Callable[[Any, dict[int, int]], list[Any]]
+Decoder = Callable[[list[Any], Sequence[Base[Any, Any]]], Base[Any, Any]]
+
+_CODECS: dict[str, tuple[type, Encoder, Decoder]] = {}
+_NAMES: dict[type, str] = {}
+_COMPOSITES: dict[str, type] = {
+    "entry": ComposedEntry,
+    "pipeline": ComposedPipeline,
+    "exit": ComposedExit,
+}
+_CACHE: dict[str, Base[Any, Any]] = {}
+
+
+def register(name: str, cls: type, encode: Encoder, decode: Decoder) -> None:
+    if name in _CODECS and _CODECS[name][0] is not cls:
+        raise ValueError(f"stage name '{name}' is already registered")
+    _CODECS[name] = (cls, encode, decode)
+    _NAMES[cls] = name
+
+
+@lru_cache(maxsize=None)
+def resolve(ref: str) -> Any:
+    module_name, _, qualname = ref.partition(":")
+    obj: Any = import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _qualified_name(obj: Any) -> str:
+    module_name = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if module_name is None or qualname is None or "<" in qualname:
+        raise ValueError(f"{obj!r} cannot be referenced by qualified name")
+    return f"{module_name}:{qualname}"
+
+
+def reference(obj: Any) -> str:
+    ref = _qualified_name(obj)
+    try:
+        resolved = resolve(ref)
+    except (ImportError, AttributeError):
+        raise ValueError(f"{obj!r} cannot be imported as '{ref}'") from None
+    if resolved is not obj:
+        raise ValueError(f"'{ref}' does not refer to {obj!r}")
+    return ref
+
+
+def _optional_reference(obj: Any) -> Optional[str]:
+    return None if obj is None else reference(obj)
+
+
+def _optional_resolve(ref: Optional[str]) -> Any:
+    return None if ref is None else resolve(ref)
+
+
+def encode_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [encode_value(d) for d in value]
+    if isinstance(value, tuple):
+        return {"t": [encode_value(d) for d in value]}
+    if isinstance(value, bytes):
+        return {"b": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, range):
+        return {"r": [value.start, value.stop, value.step]}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"d": {key: encode_value(d) for key, d in value.items()}}
+    raise ValueError(f"{type(value).__name__} value cannot be serialized")
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [decode_value(d) for d in value]
+    if isinstance(value, dict):
+        if "t" in value:
+            return tuple(decode_value(d) for d in value["t"])
+        if "b" in value:
+            return base64.b64decode(value["b"])
+        if "r" in value:
+            return range(*value["r"])
+        return {key: decode_value(d) for key, d in value["d"].items()}
+    return value
+
+
+def _encode_hints(hints: StageHints) -> Optional[dict[str, Any]]:
+    fields = {
+        key: value
+        for key, value in vars(hints).items()
+        if value != getattr(StageHints, key)
+    }
+    return fields or None
+
+
+def _encode_stage(stage: Base[Any, Any], positions: dict[int, int]) -> list[Any]:
+    func = getattr(stage, "_func", None)
+    if func is not None:
+        try:
+            ref = _qualified_name(func)
+            if resolve(ref) is stage:
+                return ["@", ref]
+        except (ImportError, AttributeError, ValueError):
+            pass
+    name = _NAMES.get(type(stage))
+    if name is None:
+        raise ValueError(f"{type(stage).__name__} stages cannot be serialized")
+    return [name, *_CODECS[name][1](stage, positions)]
+
+
+def _decode_stage(spec: list[Any], built: Sequence[Base[Any, Any]]) -> Base[Any, Any]:
+    name, *params = spec
+    if name == "@":
+        stage = resolve(params[0])
+        if not isinstance(stage, Base):
+            raise ValueError(f"'{params[0]}' is not a ruro stage")
+        return stage
+    if name not in _CODECS:
+        raise ValueError(f"unknown stage '{name}'")
+    return _CODECS[name][2](params, built)
+
+
+def dumps(pipeline: Base[Any, Any]) -> bytes:
+    stages = pipeline.stages
+    positions = {id(stage): index for index, stage in enumerate(stages)}
+    document: dict[str, Any] = {
+        "v": FORMAT_VERSION,
+        "s": [_encode_stage(stage, positions) for stage in stages],
+    }
+    if isinstance(pipeline, BaseComposed):
+        for kind, cls in _COMPOSITES.items():
+            if type(pipeline) is cls:
+                document["c"] = kind
+                break
+        else:
+            raise ValueError(f"{type(pipeline).__name__} cannot be serialized")
+    return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _build(data: bytes) -> Base[Any, Any]:
+    document = json.loads(data)
+    if document.get("v") != FORMAT_VERSION:
+        raise ValueError(f"unsupported format version {document.get('v')!r}")
+    built: list[Base[Any, Any]] = []
+    for spec in document["s"]:
+        built.append(_decode_stage(spec, built))
+    if "c" not in document:
+        if len(built) != 1:
+            raise ValueError("a single stage document must contain one stage")
+        return built[0]
+    if document["c"] not in _COMPOSITES:
+        raise ValueError(f"unknown composite kind {document['c']!r}")
+    return _COMPOSITES[document["c"]](built)  # type: ignore[no-any-return]
+
+
+def loads(data: bytes, cache: bool = True) -> Base[Any, Any]:
+    if not cache:
+        return _build(data)
+    key = content_hash(data)
+    retval = _CACHE.get(key)
+    if retval is None:
+        retval = _build(data)
+        if len(_CACHE) >= CACHE_SIZE:
+            del _CACHE[next(iter(_CACHE))]
+        _CACHE[key] = retval
+    return retval
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+def _func_stage(cls: type) -> tuple[Encoder, Decoder]:
+    def encode(stage: Any, positions: dict[int, int]) -> list[Any]:
+        hints = _encode_hints(stage.hints)
+        return [reference(stage._func)] + ([] if hints is None else [hints])
+
+    def decode(params: list[Any], built: Sequence[Base[Any, Any]]) -> Any:
+        hints = StageHints(**params[1]) if len(params) > 1 else None
+        return cls(resolve(params[0]), hints)
+
+    return encode, decode
+
+
+def _dependency_positions(
+    stage: basics.Filter[Any], positions: dict[int, int]
+) -> list[int]:
+    for dependency in stage.depends_on:
+        if id(dependency) not in positions:
+            raise ValueError(
+                f"{stage._describe()} depends on {dependency._describe()},"
+                " which is not part of the serialized pipeline"
+            )
+    return [positions[id(dependency)] for dependency in stage.depends_on]
+
+
+for _cls in (Entry, Pipeline, Exit, IterableEntry, IterablePipeline, IterableExit):
+    register(_cls.__name__, _cls, *_func_stage(_cls))
+
+register(
+    "Constant",
+    basics.Constant,
+    lambda stage, positions: [encode_value(stage._value)],
+    lambda params, built: basics.Constant(decode_value(params[0])),
+)
+register(
+    "IterableConstant",
+    basics.IterableConstant,
+    lambda stage, positions: [encode_value(stage._value)],
+    lambda params, built: basics.IterableConstant(decode_value(params[0])),
+)
+register(
+    "Exec",
+    basics.Exec,
+    lambda stage, positions: [],
+    lambda params, built: basics.Exec(),
+)
+register(
+    "Map",
+    basics.Map,
+    lambda stage, positions: [reference(stage._func)],
+    lambda params, built: basics.Map(resolve(params[0])),
+)
+register(
+    "Filter",
+    basics.Filter,
+    lambda stage, positions: [
+        reference(stage._func),
+        stage.cost,
+        stage.selectivity,
+        _dependency_positions(stage, positions),
+    ],
+    lambda params, built: basics.Filter(
+        resolve(params[0]), params[1], params[2], [built[i] for i in params[3]]
+    ),
+)
+register(
+    "Sum",
+    basics.Sum,
+    lambda stage, positions: [
+        encode_value(stage._initial_value),
+        stage._precise,
+    ],
+    lambda params, built: basics.Sum(decode_value(params[0]), params[1]),
+)
+register(
+    "Product",
+    basics.Product,
+    lambda stage, positions: [encode_value(stage._initial_value)],
+    lambda params, built: basics.Product(decode_value(params[0])),
+)
+register(
+    "Concat",
+    basics.Concat,
+    lambda stage, positions: [encode_value(stage._initial_value)],
+    lambda params, built: basics.Concat(decode_value(params[0])),
+)
+register(
+    "FromRows",
+    columnar.FromRows,
+    lambda stage, positions: [stage._batch_size],
+    lambda params, built: columnar.FromRows(params[0]),
+)
+register(
+    "ToRows",
+    columnar.ToRows,
+    lambda stage, positions: [],
+    lambda params, built: columnar.ToRows(),
+)
+register(
+    "Select",
+    columnar.Select,
+    lambda stage, positions: [list(stage._cols)],
+    lambda params, built: columnar.Select(params[0]),
+)
+register(
+    "MapColumn",
+    columnar.MapColumn,
+    lambda stage, positions: [
+        stage._col,
+        reference(stage._func),
+        stage._output,
+        stage._vectorized,
+    ],
+    lambda params, built: columnar.MapColumn(
+        params[0], resolve(params[1]), params[2], params[3]
+    ),
+)
+register(
+    "FilterRows",
+    columnar.FilterRows,
+    lambda stage, positions: [reference(stage._func)],
+    lambda params, built: columnar.FilterRows(resolve(params[0])),
+)
+register(
+    "SortExternal",
+    spill.SortExternal,
+    lambda stage, positions: [
+        _optional_reference(stage._key),
+        stage._memory_limit,
+        stage._reverse,
+        stage._directory,
+        stage._fan_in,
+    ],
+    lambda params, built: spill.SortExternal(
+        _optional_resolve(params[0]), params[1], params[2], params[3], params[4]
+    ),
+)
+register(
+    "GroupByExternal",
+    spill.GroupByExternal,
+    lambda stage, positions: [
+        reference(stage._key),
+        reference(stage._aggregate),
+        stage._memory_limit,
+        stage._directory,
+        stage._fan_in,
+    ],
+    lambda params, built: spill.GroupByExternal(
+        resolve(params[0]), resolve(params[1]), params[2], params[3], params[4]
+    ),
+)
+register(
+    "Collect",
+    spill.Collect,
+    lambda stage, positions: [stage._memory_limit, stage._directory],
+    lambda params, built: spill.Collect(params[0], params[1]),
+)
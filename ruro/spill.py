@@ -0,0 +1,258 @@
+import pickle
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager
+from heapq import merge
+from itertools import groupby
+from types import TracebackType
+from typing import IO, Any, Generic, Literal, Optional, Type
+
+from ruro.base import BaseIterablePipeline, BasePipeline, T, U
+
+
+DEFAULT_MEMORY_LIMIT = 100_000
+DEFAULT_FAN_IN = 64
+CHUNK_SIZE = 1024
+
+
+def _check_memory_limit(memory_limit: int) -> int:
+    if memory_limit <= 0:
+        raise ValueError("memory_limit must be positive")
+    return memory_limit
+
+
+def _check_fan_in(fan_in: int) -> int:
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    return fan_in
+
+
+def _write(items: list[Any], file: IO[bytes]) -> None:
+    for start in range(0, len(items), CHUNK_SIZE):
+        pickle.dump(items[start : start + CHUNK_SIZE], file, pickle.HIGHEST_PROTOCOL)
+
+
+def _spill(items: list[Any], directory: Optional[str]) -> IO[bytes]:
+    file = tempfile.TemporaryFile(dir=directory)
+    _write(items, file)
+    file.seek(0)
+    return file
+
+
+def _read(file: IO[bytes]) -> Iterator[Any]:
+    while True:
+        try:
+            chunk = pickle.load(file)
+        except EOFError:
+            return
+        yield from chunk
+
+
+def _merge_runs(
+    runs: list[IO[bytes]],
+    key: Optional[Callable[[Any], Any]],
+    reverse: bool,
+    directory: Optional[str],
+) -> IO[bytes]:
+    file = tempfile.TemporaryFile(dir=directory)
+    try:
+        chunk: list[Any] = []
+        for d in merge(*map(_read, runs), key=key, reverse=reverse):
+            chunk.append(d)
+            if len(chunk) >= CHUNK_SIZE:
+                pickle.dump(chunk, file, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, file, pickle.HIGHEST_PROTOCOL)
+        file.seek(0)
+    except BaseException:
+        file.close()
+        raise
+    for run in runs:
+        run.close()
+    return file
+
+
+def sort_external(
+    iterable: Iterable[T],
+    key: Optional[Callable[[T], Any]] = None,
+    reverse: bool = False,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    directory: Optional[str] = None,
+    fan_in: int = DEFAULT_FAN_IN,
+) -> Iterator[T]:
+    # levels[i] holds runs merged i times; higher levels hold older items.
+    levels: list[list[IO[bytes]]] = []
+    try:
+        buffer: list[T] = []
+        for d in iterable:
+            buffer.append(d)
+            if len(buffer) < memory_limit:
+                continue
+            buffer.sort(key=key, reverse=reverse)
+            run = _spill(buffer, directory)
+            buffer = []
+            level = 0
+            while True:
+                if level == len(levels):
+                    levels.append([])
+                levels[level].append(run)
+                if len(levels[level]) < fan_in:
+                    break
+                run = _merge_runs(levels[level], key, reverse, directory)
+                levels[level] = []
+                level += 1
+        buffer.sort(key=key, reverse=reverse)
+        runs = [run for level_runs in reversed(levels) for run in level_runs]
+        if not runs:
+            yield from buffer
+            return
+        levels = [runs]
+        while len(runs) > fan_in - 1:
+            merged = _merge_runs(runs[:fan_in], key, reverse, directory)
+            runs = [merged, *runs[fan_in:]]
+            levels = [runs]
+        yield from merge(*map(_read, runs), buffer, key=key, reverse=reverse)
+    finally:
+        for level_runs in levels:
+            for run in level_runs:
+                run.close()
+
+
+class SortExternal(BaseIterablePipeline[Iterable[T], T]):
+    def __init__(
+        self,
+        key: Optional[Callable[[T], Any]] = None,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        reverse: bool = False,
+        directory: Optional[str] = None,
+        fan_in: int = DEFAULT_FAN_IN,
+    ):
+        self._key = key
+        self._memory_limit = _check_memory_limit(memory_limit)
+        self._reverse = reverse
+        self._directory = directory
+        self._fan_in = _check_fan_in(fan_in)
+
+    def _exec(self, arg: Iterable[T]) -> Iterable[T]:
+        return sort_external(
+            arg,
+            self._key,
+            self._reverse,
+            self._memory_limit,
+            self._directory,
+            self._fan_in,
+        )
+
+
+class GroupByExternal(BaseIterablePipeline[Iterable[T], tuple[Any, U]]):
+    def __init__(
+        self,
+        key: Callable[[T], Any],
+        aggregate: Callable[[Iterable[T]], U] = list,  # type: ignore[assignment]
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        directory: Optional[str] = None,
+        fan_in: int = DEFAULT_FAN_IN,
+    ):
+        self._key = key
+        self._aggregate = aggregate
+        self._memory_limit = _check_memory_limit(memory_limit)
+        self._directory = directory
+        self._fan_in = _check_fan_in(fan_in)
+
+    def _exec(self, arg: Iterable[T]) -> Iterable[tuple[Any, U]]:
+        ordered = sort_external(
+            arg, self._key, False, self._memory_limit, self._directory, self._fan_in
+        )
+        try:
+            for k, group in groupby(ordered, self._key):
+                yield k, self._aggregate(group)
+        finally:
+            ordered.close()  # type: ignore[attr-defined]
+
+
+class Spool(Iterable[T], AbstractContextManager["Spool[T]"], Generic[T]):
+    def __init__(
+        self,
+        iterable: Iterable[T],
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        directory: Optional[str] = None,
+    ):
+        self._file: Optional[IO[bytes]] = None
+        self._closed = False
+        self._length = 0
+        buffer: list[T] = []
+        for d in iterable:
+            buffer.append(d)
+            if len(buffer) >= memory_limit:
+                if self._file is None:
+                    self._file = tempfile.TemporaryFile(dir=directory)
+                _write(buffer, self._file)
+                self._length += len(buffer)
+                buffer = []
+        self._buffer = buffer
+        self._length += len(buffer)
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("I/O operation on closed spool")
+
+    def __len__(self) -> int:
+        self._check_open()
+        return self._length
+
+    def __iter__(self) -> Iterator[T]:
+        self._check_open()
+        return self._iter()
+
+    def _iter(self) -> Iterator[T]:
+        if self._file is not None:
+            file = self._file
+            offset = 0
+            while True:
+                self._check_open()
+                file.seek(offset)
+                try:
+                    chunk = pickle.load(file)
+                except EOFError:
+                    break
+                offset = file.tell()
+                yield from chunk
+        self._check_open()
+        yield from self._buffer
+
+    def close(self) -> None:
+        self._closed = True
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = []
+        self._length = 0
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        excinst: Optional[BaseException],
+        exctb: Optional[TracebackType],
+    ) -> Literal[False]:
+        self.close()
+        return False
+
+
+class Collect(BasePipeline[Iterable[T], Spool[T]]):
+    def __init__(
+        self, memory_limit: int = DEFAULT_MEMORY_LIMIT, directory: Optional[str] = None
+    ):
+        self._memory_limit = _check_memory_limit(memory_limit)
+        self._directory = directory
+
+    def _exec(self, arg: Iterable[T]) -> Spool[T]:
+        return Spool(arg, self._memory_limit, self._directory)
@@ -0,0 +1,160 @@
+import os
+from collections.abc import Iterable, Iterator
+from itertools import count
+from math import floor, log2
+from threading import Lock
+from time import perf_counter
+from typing import Any, Optional, TypeVar
+from weakref import WeakKeyDictionary
+
+from ruro import base
+
+
+T = TypeVar("T")
+
+BUCKETS_PER_OCTAVE = 8
+MIN_LATENCY = 1e-9
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self._buckets: dict[int, int] = {}
+        self._count = 0
+        self._total = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def record(self, seconds: float) -> None:
+        index = floor(log2(max(seconds, MIN_LATENCY)) * BUCKETS_PER_OCTAVE)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self._count += 1
+        self._total += seconds
+
+    def percentile(self, q: float) -> float:
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be between 0 and 1")
+        if self._count == 0:
+            return 0.0
+        threshold = q * self._count
+        cumulative = 0
+        index = 0
+        for index, n in sorted(self._buckets.items()):
+            cumulative += n
+            if cumulative >= threshold:
+                break
+        return float(2 ** ((index + 1) / BUCKETS_PER_OCTAVE))
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self._count,
+            "mean": self._total / self._count if self._count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class _Channel:
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.counter = count()
+        self.histogram = LatencyHistogram()
+
+
+class Sampler:
+    def __init__(self, every: int) -> None:
+        if every <= 0:
+            raise ValueError("every must be positive")
+        self._every = every
+        # Stages are often rebuilt per call, so instances with the same label
+        # share one channel; the weak mapping only saves describing them again.
+        self._channels: dict[str, _Channel] = {}
+        self._stages: WeakKeyDictionary[Any, _Channel] = WeakKeyDictionary()
+        self._lock = Lock()
+
+    @property
+    def every(self) -> int:
+        return self._every
+
+    def _channel(self, stage: Any) -> _Channel:
+        channel = self._stages.get(stage)
+        if channel is not None:
+            return channel
+        label = stage._describe()
+        with self._lock:
+            channel = self._channels.get(label)
+            if channel is None:
+                channel = self._channels[label] = _Channel(label)
+            self._stages[stage] = channel
+        return channel
+
+    def label(self, stage: Any) -> str:
+        return self._channel(stage).label
+
+    def sample(self, stage: Any) -> bool:
+        if not stage._traced:
+            return False
+        return next(self._channel(stage).counter) % self._every == 0
+
+    def record(self, stage: Any, seconds: float) -> None:
+        self._channel(stage).histogram.record(seconds)
+
+    def items(self, stage: Any, iterable: Iterable[T]) -> Iterable[T]:
+        if not stage._traced:
+            return iterable
+        return self._items(self._channel(stage), iterable)
+
+    def _items(self, channel: _Channel, iterable: Iterable[T]) -> Iterator[T]:
+        counter = channel.counter
+        histogram = channel.histogram
+        every = self._every
+        iterator = iter(iterable)
+        while True:
+            if next(counter) % every == 0:
+                start = perf_counter()
+                try:
+                    d = next(iterator)
+                except StopIteration:
+                    return
+                histogram.record(perf_counter() - start)
+            else:
+                try:
+                    d = next(iterator)
+                except StopIteration:
+                    return
+            yield d
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            label: channel.histogram.as_dict()
+            for label, channel in list(self._channels.items())
+        }
+
+
+def enable(every: int = 100) -> Sampler:
+    sampler = Sampler(every)
+    base._SAMPLER = sampler
+    return sampler
+
+
+def disable() -> None:
+    base._SAMPLER = None
+
+
+def sampler() -> Optional[Sampler]:
+    return base._SAMPLER
+
+
+def stats() -> dict[str, dict[str, float]]:
+    current = sampler()
+    return {} if current is None else current.stats()
+
+
+if os.environ.get("RURO_TRACE_SAMPLE"):
+    enable(int(os.environ["RURO_TRACE_SAMPLE"]))
@@ -1,7 +1,9 @@
+import io
+import warnings
 from unittest import TestCase
 from unittest.mock import patch, MagicMock, call
 
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Iterator
 
 from types import TracebackType
 from typing import Type, Optional
@@ -345,3 +347,236 @@ class IterableExitTestCase(TestCase):
         each.assert_has_calls([call("0", 0), call("1", 1), call("2", 2), call("3", 3)])
 
         x = base.IterableEntry[int](lambda: range(10))
+
+
+class ComposedTestCase(TestCase):
+    def test_composition_keeps_flat_stage_list(self) -> None:
+        e = base.Entry[int](lambda: 3)
+        p1 = base.Pipeline[int, int](lambda x: x + 1)
+        p2 = base.Pipeline[int, int](lambda x: x * 2)
+        x = base.Exit[int, str](str)
+        sut = (e | p1) | (p2 | x)  # type: ignore[operator]
+        self.assertIsInstance(sut, str)
+        self.assertEqual(sut, "8")
+
+        entry = e | p1 | p2
+        self.assertIsInstance(entry, base.ComposedEntry)
+        self.assertEqual(entry.stages, (e, p1, p2))
+
+        exit_ = p1 | (p2 | x)
+        self.assertIsInstance(exit_, base.ComposedExit)
+        self.assertEqual(exit_.stages, (p1, p2, x))
+        self.assertEqual(exit_(3), "8")
+
+    def test_explain_lists_stages(self) -> None:
+        def inc(x: int) -> int:
+            return x + 1
+
+        sut = base.Pipeline[int, int](inc) | base.Pipeline[int, int](inc)
+        expected = "\n".join(
+            [
+                "ComposedPipeline",
+                "  0: Pipeline(ComposedTestCase.test_explain_lists_stages.<locals>.inc)"
+                "  (pipeline, scalar)",
+                "  1: Pipeline(ComposedTestCase.test_explain_lists_stages.<locals>.inc)"
+                "  (pipeline, scalar)",
+            ]
+        )
+        self.assertEqual(sut.explain(), expected)
+
+    def test_explain_reports_kinds_and_stats(self) -> None:
+        sut = base.IterableEntry[int](lambda: range(4)) | base.Exit[
+            Iterable[int], int
+        ](sum)
+        self.assertEqual(sut, 6)
+        entry = base.IterableEntry[int](lambda: range(4)) | base.IterablePipeline[
+            Iterable[int], int
+        ](lambda it: (d for d in it if d > 1))
+        assert isinstance(entry, base.ComposedEntry)
+        entry.collect_stats()
+        self.assertEqual(list(entry()), [2, 3])
+        lines = entry.explain().splitlines()
+        self.assertEqual(lines[0], "ComposedEntry")
+        self.assertRegex(
+            lines[1], r"^  0: IterableEntry\(.+\)  \(entry, iterable, calls=1 out=4 "
+        )
+        self.assertRegex(
+            lines[2],
+            r"^  1: IterablePipeline\(.+\)  \(pipeline, iterable, calls=1 in=4 out=2 "
+            r"selectivity=0.500 time=[0-9.]+ms\)$",
+        )
+
+    def test_to_dot(self) -> None:
+        def quoted(it: Iterable[str]) -> Iterable[str]:
+            return ('"' + d + '"' for d in it)
+
+        sut = base.IterableEntry[str](lambda: ["a", "b"]) | base.IterablePipeline[
+            Iterable[str], str
+        ](quoted)
+        assert isinstance(sut, base.ComposedEntry)
+        sut.collect_stats()
+        self.assertEqual(list(sut()), ['"a"', '"b"'])
+        actual = sut.to_dot()
+        self.assertTrue(actual.startswith("digraph ComposedEntry {\n  rankdir=LR;\n"))
+        self.assertIn('  s0 [shape=box, label="0: IterableEntry(', actual)
+        self.assertIn("\\nentry, iterable, calls=1 out=2 ", actual)
+        self.assertIn('  s0 -> s1 [label="2"];', actual)
+        self.assertTrue(actual.endswith("}"))
+
+    def test_collect_stats_counts_items(self) -> None:
+        def evens(it: Iterable[int]) -> Iterable[int]:
+            return (d for d in it if d % 2 == 0)
+
+        sut = base.IterableEntry[int](lambda: range(10)) | base.IterablePipeline[
+            Iterable[int], int
+        ](evens)
+        assert isinstance(sut, base.ComposedEntry)
+        self.assertIsNone(sut.stats)
+        sut.collect_stats()
+        self.assertEqual(list(sut()), [0, 2, 4, 6, 8])
+        stats = sut.stats
+        assert stats is not None
+        self.assertEqual([s.calls for s in stats], [1, 1])
+        self.assertEqual([s.items_in for s in stats], [None, 10])
+        self.assertEqual([s.items_out for s in stats], [10, 5])
+        self.assertEqual(stats[1].selectivity, 0.5)
+        self.assertTrue(all(s.elapsed >= 0.0 for s in stats))
+
+
+class StageIteratorTestCase(TestCase):
+    def test_iterable_stage_is_a_context_manager(self) -> None:
+        closed: list[str] = []
+
+        def source() -> Iterable[int]:
+            try:
+                yield from range(10)
+            finally:
+                closed.append("source")
+
+        class Example(base.IterablePipeline[Iterable[int], int]):
+            def _after(
+                self,
+                exc_type: Optional[Type[BaseException]],
+                excinst: Optional[BaseException],
+                exctb: Optional[TracebackType],
+            ) -> None:
+                closed.append("after")
+
+        sut = base.IterableEntry[int](source) | Example(lambda it: (d * 2 for d in it))
+        with sut() as it:
+            self.assertIsInstance(it, base.StageIterator)
+            self.assertEqual(next(it), 0)
+            self.assertEqual(next(it), 2)
+            self.assertEqual(closed, [])
+        self.assertTrue(it.closed)
+        self.assertEqual(closed, ["after", "source"])
+
+    def test_close_leaves_the_callers_argument_open(self) -> None:
+        upstream = base.IterableEntry[int](lambda: range(3))()
+        sut = base.IterablePipeline[Iterable[int], int](lambda it: it)
+        with patch("ruro.base.Base._after", return_value=None) as after:
+            it = sut(upstream)
+            it.close()
+            it.close()
+            after.assert_not_called()
+        self.assertFalse(upstream.closed)
+        self.assertEqual(list(upstream), [0, 1, 2])
+
+        file = io.StringIO("a \nb \n")
+        strip = base.IterablePipeline[Iterable[str], str](lambda f: map(str.strip, f))
+        with strip(file) as lines:
+            self.assertEqual(next(lines), "a")
+        self.assertFalse(file.closed)
+
+    def test_close_propagates_to_iterators_created_by_the_composite(self) -> None:
+        closed: list[str] = []
+
+        def source() -> Iterable[int]:
+            try:
+                yield from range(10)
+            finally:
+                closed.append("source")
+
+        passthrough = base.IterablePipeline[Iterable[int], int](lambda it: it)
+        sut = base.IterableEntry[int](source) | passthrough
+        assert isinstance(sut, base.ComposedEntry)
+        for collect in (False, True):
+            sut.collect_stats(collect)
+            with sut() as it:
+                self.assertEqual(next(it), 0)
+            self.assertEqual(closed, ["source"])
+            closed.clear()
+
+    def test_exhausted_stage_calls_after_once(self) -> None:
+        with patch("ruro.base.Base._after", return_value=None) as after:
+            with base.IterableEntry[int](lambda: range(3))() as it:
+                self.assertEqual(list(it), [0, 1, 2])
+            after.assert_called_once_with(None, None, None)
+
+    def test_exhaustion_does_not_close_values_the_stage_does_not_own(self) -> None:
+        class Closable:
+            def __init__(self) -> None:
+                self.closed = False
+
+            def __iter__(self) -> Iterator[int]:
+                return iter([] if self.closed else [1, 2])
+
+            def close(self) -> None:
+                self.closed = True
+
+        value = Closable()
+        sut = base.IterableEntry[int](lambda: value)
+        self.assertEqual(list(sut()), [1, 2])
+        self.assertEqual(list(sut()), [1, 2])
+        self.assertFalse(value.closed)
+
+        class ClosableIterator(Iterator[int]):
+            def __init__(self) -> None:
+                self._iterator = iter([1, 2])
+                self.closed = False
+
+            def __next__(self) -> int:
+                return next(self._iterator)
+
+            def close(self) -> None:
+                self.closed = True
+
+        upstream = ClosableIterator()
+        passthrough = base.IterablePipeline[Iterable[int], int](lambda it: it)
+        self.assertEqual(list(passthrough(upstream)), [1, 2])
+        self.assertFalse(upstream.closed)
+
+    def test_explicit_close_closes_generated_iterator(self) -> None:
+        closed: list[bool] = []
+
+        def generate(it: Iterable[int]) -> Iterator[int]:
+            try:
+                yield from it
+            finally:
+                closed.append(True)
+
+        with base.IterablePipeline[Iterable[int], int](generate)([1, 2]) as it:
+            self.assertEqual(next(it), 1)
+        self.assertEqual(closed, [True])
+
+    def test_leak_detection_warns_about_unclosed_stages(self) -> None:
+        from ruro import debug
+
+        previous = debug.leak_detection_enabled()
+        debug.enable_leak_detection()
+        try:
+            it = base.IterableEntry[int](lambda: range(3))()
+            self.assertEqual(next(it), 0)
+            with self.assertWarnsRegex(ResourceWarning, "test_base.py"):
+                del it
+
+            with base.IterableEntry[int](lambda: range(3))() as closed:
+                next(closed)
+            exhausted = base.IterableEntry[int](lambda: range(3))()
+            self.assertEqual(list(exhausted), [0, 1, 2])
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                del closed
+                del exhausted
+        finally:
+            debug.enable_leak_detection(previous)
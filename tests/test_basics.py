@@ -72,6 +72,12 @@ class FilterTestCase(TestCase):
         actual = list(sut([0, 1, 2, 3, 4, 5]))
         self.assertEqual(actual, expected)
 
+    def test_filter_rejects_invalid_annotations(self) -> None:
+        with self.assertRaisesRegex(ValueError, "selectivity"):
+            _ = basics.Filter[int](bool, selectivity=1.5)
+        with self.assertRaisesRegex(ValueError, "cost"):
+            _ = basics.Filter[int](bool, cost=-1)
+
 
 class SumTestCase(TestCase):
     def test_sum(self) -> None:
@@ -86,3 +92,46 @@ class SumTestCase(TestCase):
         expected = [0, 1, 2, -1, -2]
         actual = sut([[0], [1, 2], [-1, -2]])
         self.assertEqual(actual, expected)
+
+    def test_sum_concatenates_sequences_in_one_pass(self) -> None:
+        self.assertEqual(basics.Sum[str]("x")(["a", "bc"]), "xabc")
+        self.assertEqual(basics.Sum[bytes](b"")([b"a", b"b"]), b"ab")
+        self.assertEqual(basics.Sum[tuple[int, ...]](())([(1,), (2, 3)]), (1, 2, 3))
+        initial: list[int] = [0]
+        self.assertEqual(basics.Sum[list[int]](initial)(iter([[1], [2]])), [0, 1, 2])
+        self.assertEqual(initial, [0])
+
+    def test_precise_sum(self) -> None:
+        data = [0.1] * 10
+        self.assertNotEqual(basics.Sum[float](0.0)(data), 1.0)
+        self.assertEqual(basics.Sum[float](0.0, precise=True)(data), 1.0)
+
+    def test_sum_rejects_non_sequence_items(self) -> None:
+        with self.assertRaises(TypeError):
+            _ = basics.Sum[list[str]]([])(["ab", "c"])
+        with self.assertRaises(TypeError):
+            _ = basics.Sum[tuple[int, ...]](())([(1,), range(2)])
+
+
+class ProductTestCase(TestCase):
+    def test_product(self) -> None:
+        sut = basics.Product[int]()
+        self.assertIsInstance(sut, base.BasePipeline)
+        self.assertEqual(sut([1, 2, 3, 4]), 24)
+        self.assertEqual(basics.Product[int](2)([]), 2)
+
+
+class ConcatTestCase(TestCase):
+    def test_concat_follows_first_item_type(self) -> None:
+        sut = basics.Concat[str]()
+        self.assertIsInstance(sut, base.BasePipeline)
+        self.assertEqual(sut(["a", "b"]), "ab")
+        self.assertEqual(basics.Concat[list[int]]()(iter([[1], (2, 3)])), [1, 2, 3])
+        self.assertEqual(basics.Concat[list[int]]()([]), [])
+        self.assertEqual(basics.Concat[str]("")([]), "")
+        with self.assertRaises(TypeError):
+            _ = basics.Concat[list[str]]()([["a"], "bc"])
+        with self.assertRaises(TypeError):
+            _ = basics.Concat[set[int]]()([{1, 2}])
+        with self.assertRaises(TypeError):
+            _ = basics.Concat[set[int]]({1})([])
@@ -0,0 +1,103 @@
+from array import array
+from unittest import TestCase
+
+from ruro import base, basics, columnar
+
+
+ROWS = [{"id": i, "score": i * 1.5, "name": f"n{i}"} for i in range(5)]
+
+
+class FromRowsTestCase(TestCase):
+    def test_from_rows_builds_column_batches(self) -> None:
+        sut = columnar.FromRows(2)
+        self.assertIsInstance(sut, base.BaseIterablePipeline)
+        actual = list(sut(ROWS))
+        self.assertEqual(len(actual), 3)
+        self.assertEqual(
+            actual[0], {"id": [0, 1], "score": [0.0, 1.5], "name": ["n0", "n1"]}
+        )
+        self.assertEqual(actual[2], {"id": [4], "score": [6.0], "name": ["n4"]})
+
+    def test_from_rows_rejects_non_positive_batch_size(self) -> None:
+        with self.assertRaisesRegex(ValueError, "batch_size"):
+            _ = columnar.FromRows(0)
+
+    def test_from_rows_rejects_rows_with_different_keys(self) -> None:
+        sut = columnar.FromRows(2)
+        with self.assertRaisesRegex(ValueError, "same keys"):
+            _ = list(sut([{"a": 1}, {"a": 2, "b": 3}]))
+        with self.assertRaisesRegex(ValueError, "same keys"):
+            _ = list(sut([{"a": 1, "b": 2}, {"a": 3}]))
+        actual = list(sut([{"a": 1, "b": 2}, {"b": 3, "a": 4}]))
+        self.assertEqual(actual, [{"a": [1, 4], "b": [2, 3]}])
+
+
+class ToRowsTestCase(TestCase):
+    def test_round_trip(self) -> None:
+        sut = columnar.FromRows(3) | columnar.ToRows()
+        self.assertEqual(list(sut(ROWS)), ROWS)
+
+
+class SelectTestCase(TestCase):
+    def test_select_keeps_columns(self) -> None:
+        sut = columnar.Select(["name", "id"])
+        actual = list(sut([{"id": [1], "score": [2.0], "name": ["a"]}]))
+        self.assertEqual(actual, [{"name": ["a"], "id": [1]}])
+
+
+class MapColumnTestCase(TestCase):
+    def test_map_column_in_place_and_to_output(self) -> None:
+        batch = {"id": [1, 2]}
+        self.assertEqual(
+            list(columnar.MapColumn("id", lambda d: d * 10)([batch])),
+            [{"id": [10, 20]}],
+        )
+        self.assertEqual(
+            list(columnar.MapColumn("id", str, output="key")([batch])),
+            [{"id": [1, 2], "key": ["1", "2"]}],
+        )
+        self.assertEqual(batch, {"id": [1, 2]})
+
+    def test_map_column_keeps_array_typecode(self) -> None:
+        batch = {"v": array("d", [1.0, 2.0])}
+        (actual,) = columnar.MapColumn("v", lambda d: d / 2)([batch])
+        self.assertEqual(actual["v"], array("d", [0.5, 1.0]))
+        (actual,) = columnar.MapColumn("v", str)([batch])
+        self.assertEqual(actual["v"], ["1.0", "2.0"])
+
+    def test_vectorized_map_column_receives_whole_column(self) -> None:
+        sut = columnar.MapColumn("v", lambda col: col[::-1], vectorized=True)
+        (actual,) = sut([{"v": [1, 2]}])
+        self.assertEqual(actual, {"v": [2, 1]})
+
+
+class FilterRowsTestCase(TestCase):
+    def test_filter_rows(self) -> None:
+        sut = columnar.FilterRows(lambda b: [d % 2 == 0 for d in b["id"]])
+        batches = [
+            {"id": array("q", [0, 1, 2]), "name": ["a", "b", "c"]},
+            {"id": array("q", [3]), "name": ["d"]},
+        ]
+        actual = list(sut(batches))
+        self.assertEqual(actual, [{"id": array("q", [0, 2]), "name": ["a", "c"]}])
+
+    def test_filter_rows_rejects_mismatched_mask(self) -> None:
+        sut = columnar.FilterRows(lambda b: [True])
+        with self.assertRaisesRegex(ValueError, "mask length"):
+            _ = list(sut([{"id": [1, 2]}]))
+
+    def test_columnar_chain(self) -> None:
+        sut = (
+            basics.IterableConstant[dict[str, object]](ROWS)
+            | columnar.FromRows(2)
+            | columnar.Select(["id", "score"])
+            | columnar.FilterRows(lambda b: [s > 2 for s in b["score"]])
+            | columnar.MapColumn("score", int)
+            | columnar.ToRows()
+        )
+        expected = [
+            {"id": 2, "score": 3},
+            {"id": 3, "score": 4},
+            {"id": 4, "score": 6},
+        ]
+        self.assertEqual(list(sut()), expected)
@@ -1,8 +1,9 @@
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 
+from collections.abc import Iterator
 from typing import Callable, NoReturn
-from ruro import decorators, Entry, Pipeline, Exit
+from ruro import decorators, Entry, Pipeline, Exit, IterablePipeline
 
 
 class EntryDecoratorTest(TestCase):
@@ -42,3 +43,108 @@ class ExitDecoratorTest(TestCase):
         actual = sut(2)
 
         self.assertEqual(actual, expected)
+
+
+class PureDecoratorTest(TestCase):
+    def test_pure_pipeline_is_memoized(self) -> None:
+        calls: list[int] = []
+
+        @decorators.pipeline(pure=True)
+        def sut(a: int) -> int:
+            calls.append(a)
+            return a * 2
+
+        self.assertIsInstance(sut, Pipeline)
+        self.assertTrue(sut.hints.pure)
+        self.assertEqual([sut(1), sut(2), sut(1)], [2, 4, 2])
+        self.assertEqual(calls, [1, 2])
+
+    def test_pure_stage_with_unhashable_argument_is_not_cached(self) -> None:
+        calls: list[list[int]] = []
+
+        @decorators.exit(pure=True)
+        def sut(a: list[int]) -> int:
+            calls.append(a)
+            return len(a)
+
+        self.assertIsInstance(sut, Exit)
+        self.assertEqual([sut([1]), sut([1])], [1, 1])
+        self.assertEqual(len(calls), 2)
+
+    def test_equal_arguments_of_different_types_are_cached_apart(self) -> None:
+        @decorators.pipeline(pure=True)
+        def sut(a: float) -> float:
+            return a * 2
+
+        self.assertEqual(sut(1.0), 2.0)
+        self.assertIs(type(sut(True)), int)
+        self.assertIs(type(sut(1)), int)
+
+    def test_pure_entry_is_computed_once(self) -> None:
+        factory = MagicMock(return_value=3)
+        sut = decorators.entry(pure=True)(factory)
+        self.assertIsInstance(sut, Entry)
+        self.assertEqual([sut(), sut()], [3, 3])
+        factory.assert_called_once_with()
+
+    def test_iterators_are_not_cached(self) -> None:
+        @decorators.pipeline(pure=True)
+        def sut(a: int) -> Iterator[int]:
+            return iter(range(a))
+
+        self.assertEqual(list(sut(2)), [0, 1])
+        self.assertEqual(list(sut(2)), [0, 1])
+
+    def test_iterator_arguments_are_not_cached(self) -> None:
+        @decorators.exit(pure=True)
+        def sut(a: Iterator[int]) -> int:
+            return sum(a)
+
+        arg = iter([1, 2])
+        self.assertEqual(sut(arg), 3)
+        self.assertEqual(sut(arg), 0)
+
+    def test_cache_is_bounded(self) -> None:
+        calls: list[int] = []
+
+        @decorators.pipeline(pure=True)
+        def sut(a: int) -> int:
+            calls.append(a)
+            return a
+
+        for i in range(decorators.MEMO_SIZE + 1):
+            _ = sut(i)
+        _ = sut(0)
+        self.assertEqual(len(calls), decorators.MEMO_SIZE + 2)
+
+    def test_pure_cannot_be_vectorized(self) -> None:
+        with self.assertRaisesRegex(ValueError, "pure"):
+            _ = decorators.pipeline(pure=True, vectorized=True)
+
+
+class VectorizedDecoratorTest(TestCase):
+    def test_vectorized_pipeline_receives_batches(self) -> None:
+        sizes: list[int] = []
+
+        @decorators.pipeline(vectorized=True, batch_size=4)
+        def sut(batch: list[int]) -> list[int]:
+            sizes.append(len(batch))
+            return [d * 10 for d in batch]
+
+        self.assertIsInstance(sut, IterablePipeline)
+        self.assertEqual(list(sut(range(10))), [d * 10 for d in range(10)])
+        self.assertEqual(sizes, [4, 4, 2])
+
+    def test_batch_size_requires_vectorized(self) -> None:
+        with self.assertRaisesRegex(ValueError, "vectorized"):
+            _ = decorators.pipeline(batch_size=4)
+
+
+class HintsDecoratorTest(TestCase):
+    def test_hints_are_reported_in_explain(self) -> None:
+        @decorators.pipeline(cost=2.5, fuse=True)
+        def sut(a: int) -> int:
+            return a
+
+        self.assertEqual(sut.hints.cost, 2.5)
+        self.assertIn("[cost=2.5, fuse]", (sut | sut).explain())
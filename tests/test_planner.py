@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from ruro import base, basics, decorators, planner
+
+
+class RankTestCase(TestCase):
+    def test_rank_prefers_cheap_and_selective(self) -> None:
+        self.assertLess(planner.rank(1.0, 0.1), planner.rank(1.0, 0.9))
+        self.assertLess(planner.rank(1.0, 0.5), planner.rank(10.0, 0.5))
+        self.assertEqual(planner.rank(0.0, 1.0), float("inf"))
+
+
+class OptimizeTestCase(TestCase):
+    def test_optimize_reorders_adjacent_filters(self) -> None:
+        loose = basics.Filter[int](lambda d: d >= 0, cost=1.0, selectivity=0.99)
+        tight = basics.Filter[int](lambda d: d % 7 == 0, cost=1.0, selectivity=0.1)
+        double = basics.Map[int, int](lambda d: d * 2)
+        original = basics.IterableConstant[int](range(100)) | double | loose | tight
+        sut = planner.optimize(original)
+        assert isinstance(sut, base.ComposedEntry)
+        self.assertEqual(sut.stages[2:], (tight, loose))
+        self.assertEqual(sut.origins, (0, 1, 3, 2))
+        self.assertEqual(list(sut()), list(original()))
+        self.assertIn("moved from 3)", sut.explain())
+
+    def test_optimize_does_not_move_filters_across_maps(self) -> None:
+        tight = basics.Filter[int](lambda d: d > 10, selectivity=0.01)
+        sut = basics.Map[int, int](lambda d: d * 2) | tight
+        self.assertIs(planner.optimize(sut), sut)
+
+    def test_optimize_respects_depends_on(self) -> None:
+        present = basics.Filter[dict[str, int]](lambda d: "x" in d, selectivity=0.9)
+        positive = basics.Filter[dict[str, int]](
+            lambda d: d["x"] > 0, cost=0.1, selectivity=0.1, depends_on=[present]
+        )
+        sut = present | positive
+        self.assertIs(planner.optimize(sut), sut)
+        data = [{"x": 1}, {}, {"x": -1}]
+        self.assertEqual(list(sut(data)), [{"x": 1}])
+
+    def test_optimize_uses_measured_stats(self) -> None:
+        rare = basics.Filter[int](lambda d: d % 10 == 0, cost=1.0)
+        common = basics.Filter[int](lambda d: d % 10 != 0, cost=1.0)
+        sut = basics.IterableConstant[int](range(100)) | common | rare
+        assert isinstance(sut, base.ComposedEntry)
+        sut.collect_stats()
+        self.assertEqual(list(sut()), [])
+        actual = planner.optimize(sut)
+        self.assertEqual(actual.stages[1:], (rare, common))
+        self.assertEqual(list(actual()), [])
+
+    def test_optimize_ignores_non_composed(self) -> None:
+        sut = basics.Filter[int](bool)
+        self.assertIs(planner.optimize(sut), sut)
+
+
+class FuseTestCase(TestCase):
+    def test_fuse_merges_adjacent_fusable_pipelines(self) -> None:
+        @decorators.pipeline(fuse=True, pure=True, cost=1.0)
+        def inc(a: int) -> int:
+            return a + 1
+
+        @decorators.pipeline(fuse=True, cost=2.0)
+        def double(a: int) -> int:
+            return a * 2
+
+        square = base.Pipeline[int, int](lambda a: a * a)
+        original = inc | double | square | inc
+        sut = planner.fuse(original)
+        assert isinstance(sut, base.ComposedPipeline)
+        self.assertEqual(len(sut.stages), 3)
+        self.assertEqual(sut.origins, (0, 2, 3))
+        self.assertEqual(sut.stages[1:], (square, inc))
+        fused = sut.stages[0]
+        self.assertEqual(fused.hints, base.StageHints(cost=3.0, fuse=True))
+        self.assertIn("inc | ", fused._describe())
+        self.assertEqual([sut(d) for d in range(5)], [original(d) for d in range(5)])
+
+    def test_optimize_fuses(self) -> None:
+        inc = decorators.pipeline(fuse=True)(lambda a: a + 1)
+        sut = planner.optimize(inc | inc)
+        self.assertEqual(len(sut.stages), 1)
+        self.assertEqual(sut(1), 3)
+
+    def test_fuse_leaves_other_pipelines(self) -> None:
+        sut = base.Pipeline[int, int](abs) | base.Pipeline[int, int](abs)
+        self.assertIs(planner.fuse(sut), sut)
@@ -0,0 +1,126 @@
+from unittest import TestCase
+
+from ruro import base, basics, columnar, decorators, serialization, spill
+
+
+def is_even(d: int) -> bool:
+    return d % 2 == 0
+
+
+def square(d: int) -> int:
+    return d * d
+
+
+def value_of(row: dict[str, int]) -> int:
+    return row["v"]
+
+
+def count() -> range:
+    return range(10)
+
+
+@decorators.pipeline(pure=True, cost=3.0)
+def increment(d: int) -> int:
+    return d + 1
+
+
+class DumpsLoadsTestCase(TestCase):
+    def tearDown(self) -> None:
+        serialization.clear_cache()
+
+    def test_round_trip_entry_map_filter_sum(self) -> None:
+        original = (
+            basics.IterableConstant[int](range(10))
+            | basics.Map[int, int](square)
+            | basics.Filter[int](is_even, cost=1.0, selectivity=0.5)
+            | basics.Sum[int]()
+        )
+        data = serialization.dumps(original)
+        self.assertLess(len(data), 300)
+        sut = serialization.loads(data)
+        self.assertIsInstance(sut, base.ComposedEntry)
+        self.assertEqual(sut(), original())
+        stage = sut.stages[2]
+        assert isinstance(stage, basics.Filter)
+        self.assertEqual((stage.cost, stage.selectivity), (1.0, 0.5))
+
+    def test_loads_caches_by_content_hash(self) -> None:
+        data = serialization.dumps(basics.Map[int, int](square) | basics.Sum[int]())
+        sut = serialization.loads(data)
+        self.assertIs(serialization.loads(data), sut)
+        self.assertIsNot(serialization.loads(data, cache=False), sut)
+        self.assertEqual(len(serialization.content_hash(data)), 32)
+
+    def test_decorated_stages_are_referenced_by_name(self) -> None:
+        original = increment | base.Exit[int, str](str)
+        data = serialization.dumps(original)
+        self.assertIn(b'["@","test_serialization:increment"]', data)
+        sut = serialization.loads(data)
+        self.assertIs(sut.stages[0], increment)
+        self.assertEqual(sut(1), "2")
+
+    def test_hints_and_values_round_trip(self) -> None:
+        original = base.Entry[range](count, base.StageHints(cost=2.0)) | basics.Sum[
+            tuple[int, ...]
+        ](())
+        sut = serialization.loads(serialization.dumps(original))
+        self.assertEqual(sut.stages[0].hints, base.StageHints(cost=2.0))
+        self.assertEqual(
+            serialization.decode_value(
+                serialization.encode_value({"a": (1, b"x", [None], range(3))})
+            ),
+            {"a": (1, b"x", [None], range(3))},
+        )
+
+    def test_filter_dependencies_round_trip(self) -> None:
+        first = basics.Filter[int](is_even)
+        second = basics.Filter[int](bool, depends_on=[first])
+        sut = serialization.loads(serialization.dumps(first | second))
+        dependent = sut.stages[1]
+        assert isinstance(dependent, basics.Filter)
+        self.assertEqual(dependent.depends_on, (sut.stages[0],))
+
+    def test_dependencies_outside_the_pipeline_cannot_be_serialized(self) -> None:
+        first = basics.Filter[int](is_even)
+        second = basics.Filter[int](bool, depends_on=[first])
+        with self.assertRaisesRegex(ValueError, "not part of the serialized pipeline"):
+            _ = serialization.dumps(basics.Map[int, int](square) | second)
+
+    def test_columnar_and_spill_stages_round_trip(self) -> None:
+        original = (
+            columnar.FromRows(2)
+            | columnar.MapColumn("v", square)
+            | columnar.ToRows()
+            | spill.SortExternal[dict[str, int]](value_of, 2, reverse=True, fan_in=3)
+            | spill.GroupByExternal[dict[str, int], list[dict[str, int]]](
+                value_of, memory_limit=2, fan_in=5
+            )
+        )
+        sut = serialization.loads(serialization.dumps(original))
+        rows = [{"v": i} for i in range(-5, 5)]
+        self.assertEqual(list(sut(rows)), list(original(rows)))
+        sort, group = sut.stages[3:]
+        assert isinstance(sort, spill.SortExternal)
+        assert isinstance(group, spill.GroupByExternal)
+        self.assertEqual((sort._fan_in, group._fan_in), (3, 5))
+
+    def test_lambdas_cannot_be_serialized(self) -> None:
+        with self.assertRaisesRegex(ValueError, "qualified name"):
+            _ = serialization.dumps(basics.Map[int, int](lambda d: d))
+
+    def test_unknown_stage_classes_cannot_be_serialized(self) -> None:
+        class Custom(base.BasePipeline[int, int]):
+            def _exec(self, arg: int) -> int:
+                return arg
+
+        with self.assertRaisesRegex(ValueError, "Custom stages cannot be serialized"):
+            _ = serialization.dumps(Custom())
+
+    def test_unsupported_version(self) -> None:
+        with self.assertRaisesRegex(ValueError, "unsupported format version"):
+            _ = serialization.loads(b'{"v":0,"s":[]}')
+
+    def test_unknown_composite_kind(self) -> None:
+        data = serialization.dumps(base.Pipeline[int, int](square))
+        with self.assertRaisesRegex(ValueError, "unknown composite kind 'loop'"):
+            _ = serialization.loads(data[:-1] + b',"c":"loop"}', cache=False)
@@ -0,0 +1,127 @@
+import random
+import tempfile
+from typing import IO, Any, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from ruro import base, basics, spill
+
+
+class SortExternalTestCase(TestCase):
+    def test_sort_external_spills_and_merges(self) -> None:
+        data = [random.randrange(1000) for _ in range(1000)]
+        sut = spill.SortExternal[int](memory_limit=64)
+        self.assertIsInstance(sut, base.BaseIterablePipeline)
+        with patch("ruro.spill._spill", wraps=spill._spill) as spilled:
+            actual = list(sut(data))
+        self.assertEqual(actual, sorted(data))
+        self.assertEqual(spilled.call_count, 15)
+
+    def test_sort_external_is_stable_with_key_and_reverse(self) -> None:
+        data = [(i % 5, i) for i in range(100)]
+        sut = spill.SortExternal[tuple[int, int]](
+            key=lambda d: d[0], memory_limit=7, reverse=True
+        )
+        expected = sorted(data, key=lambda d: d[0], reverse=True)
+        self.assertEqual(list(sut(data)), expected)
+
+    def test_sort_external_in_memory(self) -> None:
+        with patch("ruro.spill._spill") as spilled:
+            actual = list(spill.SortExternal[int]()([3, 1, 2]))
+        self.assertEqual(actual, [1, 2, 3])
+        spilled.assert_not_called()
+
+    def test_closing_removes_runs(self) -> None:
+        runs = []
+        original = spill._spill
+
+        def record(items: list[int], directory: Optional[str]) -> IO[bytes]:
+            runs.append(original(items, directory))
+            return runs[-1]
+
+        with patch("ruro.spill._spill", side_effect=record):
+            with spill.SortExternal[int](memory_limit=2)(range(10, 0, -1)) as it:
+                self.assertEqual(next(it), 1)
+                self.assertFalse(any(run.closed for run in runs))
+        self.assertEqual(len(runs), 5)
+        self.assertTrue(all(run.closed for run in runs))
+
+    def test_cascaded_merge_bounds_open_runs(self) -> None:
+        data = [(random.randrange(50), i) for i in range(3000)]
+        created: list[IO[bytes]] = []
+        peak = 0
+        original = tempfile.TemporaryFile
+
+        def track(*args: Any, **kwargs: Any) -> IO[bytes]:
+            nonlocal peak
+            created.append(original(*args, **kwargs))
+            peak = max(peak, sum(not file.closed for file in created))
+            return created[-1]
+
+        sut = spill.SortExternal[tuple[int, int]](
+            key=lambda d: d[0], memory_limit=10, fan_in=4
+        )
+        with patch("ruro.spill.tempfile.TemporaryFile", side_effect=track):
+            actual = list(sut(data))
+        self.assertEqual(actual, sorted(data, key=lambda d: d[0]))
+        self.assertGreater(len(created), 300)
+        self.assertLessEqual(peak, 20)
+        self.assertTrue(all(file.closed for file in created))
+
+    def test_fan_in_must_be_at_least_two(self) -> None:
+        with self.assertRaisesRegex(ValueError, "fan_in"):
+            _ = spill.SortExternal[int](fan_in=1)
+
+    def test_memory_limit_must_be_positive(self) -> None:
+        with self.assertRaisesRegex(ValueError, "memory_limit"):
+            _ = spill.SortExternal[int](memory_limit=0)
+
+
+class GroupByExternalTestCase(TestCase):
+    def test_group_by_external(self) -> None:
+        sut = spill.GroupByExternal[str, int](len, aggregate=sorted, memory_limit=2)
+        data = ["bb", "a", "ccc", "c", "aa", "b"]
+        expected = [(1, ["a", "b", "c"]), (2, ["aa", "bb"]), (3, ["ccc"])]
+        self.assertEqual(list(sut(data)), expected)
+
+
+class CollectTestCase(TestCase):
+    def test_collect_spools_to_disk(self) -> None:
+        sut = (
+            basics.IterableConstant[int](range(5000))
+            | spill.Collect[int](memory_limit=100)
+            | basics.Map[int, int](lambda d: d + 1)
+        )
+        self.assertEqual(list(sut()), list(range(1, 5001)))
+
+    def test_spool_is_reiterable(self) -> None:
+        sut = spill.Collect[int](memory_limit=3)(iter(range(10)))
+        self.assertTrue(sut.spilled)
+        self.assertEqual(len(sut), 10)
+        first = iter(sut)
+        self.assertEqual(next(first), 0)
+        self.assertEqual(list(sut), list(range(10)))
+        self.assertEqual(list(first), list(range(1, 10)))
+        second = iter(sut)
+        self.assertEqual(next(second), 0)
+        sut.close()
+        self.assertTrue(sut.closed)
+        with self.assertRaisesRegex(ValueError, "closed spool"):
+            _ = list(sut)
+        with self.assertRaisesRegex(ValueError, "closed spool"):
+            _ = list(second)
+        with self.assertRaisesRegex(ValueError, "closed spool"):
+            _ = len(sut)
+
+    def test_spool_is_a_context_manager(self) -> None:
+        with spill.Collect[int](memory_limit=3)(iter(range(10))) as sut:
+            self.assertEqual(list(sut), list(range(10)))
+        self.assertTrue(sut.closed)
+        self.assertFalse(sut.spilled)
+
+    def test_closing_downstream_leaves_callers_spool_open(self) -> None:
+        spool = spill.Collect[int](memory_limit=3)(iter(range(10)))
+        with basics.Map[int, int](abs)(spool) as it:
+            self.assertEqual(next(it), 0)
+        self.assertTrue(spool.spilled)
+        self.assertEqual(list(spool), list(range(10)))
@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+from ruro import base, basics, tracing
+
+
+class LatencyHistogramTestCase(TestCase):
+    def test_percentiles(self) -> None:
+        sut = tracing.LatencyHistogram()
+        for _ in range(90):
+            sut.record(0.001)
+        for _ in range(10):
+            sut.record(1.0)
+        self.assertEqual(sut.count, 100)
+        self.assertAlmostEqual(sut.total, 10.09)
+        self.assertAlmostEqual(sut.percentile(0.5), 0.001, delta=0.0001)
+        self.assertAlmostEqual(sut.percentile(0.99), 1.0, delta=0.1)
+        self.assertEqual(set(sut.as_dict()), {"count", "mean", "p50", "p95", "p99"})
+
+    def test_empty_histogram(self) -> None:
+        sut = tracing.LatencyHistogram()
+        self.assertEqual(sut.percentile(0.5), 0.0)
+        with self.assertRaisesRegex(ValueError, "q must be"):
+            _ = sut.percentile(2.0)
+
+
+class SamplerTestCase(TestCase):
+    def tearDown(self) -> None:
+        tracing.disable()
+
+    def test_disabled_by_default(self) -> None:
+        self.assertIsNone(tracing.sampler())
+        self.assertEqual(tracing.stats(), {})
+
+    def test_samples_one_in_n_calls(self) -> None:
+        def inc(x: int) -> int:
+            return x + 1
+
+        sut = base.Pipeline[int, int](inc)
+        sampler = tracing.enable(every=3)
+        for i in range(9):
+            self.assertEqual(sut(i), i + 1)
+        self.assertEqual(tracing.stats()[sampler.label(sut)]["count"], 3)
+
+    def test_samples_items_of_iterable_stages(self) -> None:
+        def double(x: int) -> int:
+            return x * 2
+
+        sut = basics.Map[int, int](double)
+        tracing.enable(every=2)
+        self.assertEqual(list(sut(range(10))), [d * 2 for d in range(10)])
+        self.assertEqual(tracing.stats()[sut._describe()]["count"], 5)
+
+    def test_counts_each_stage_separately(self) -> None:
+        def inc(x: int) -> int:
+            return x + 1
+
+        first = base.Pipeline[int, int](inc)
+        second = base.Pipeline[int, int](abs)
+        sut = first | second
+        sampler = tracing.enable(every=2)
+        for i in range(4):
+            _ = sut(i)
+        stats = sampler.stats()
+        self.assertEqual(stats[sampler.label(first)]["count"], 2)
+        self.assertEqual(stats[sampler.label(second)]["count"], 2)
+        self.assertEqual(len(stats), 2)
+
+    def test_stages_with_the_same_label_share_a_histogram(self) -> None:
+        sampler = tracing.enable(every=2)
+        for i in range(1000):
+            sut = basics.Constant[list[int]]([i]) | base.Exit[list[int], int](len)
+            self.assertEqual(sut, 1)
+        stats = sampler.stats()
+        self.assertEqual(len(stats), 2)
+        self.assertEqual([d["count"] for d in stats.values()], [500, 500])
+
+    def test_disable_stops_recording(self) -> None:
+        sampler = tracing.enable(every=1)
+        tracing.disable()
+        _ = base.Pipeline[int, int](abs)(-1)
+        self.assertEqual(sampler.stats(), {})
+
+    def test_every_must_be_positive(self) -> None:
+        with self.assertRaisesRegex(ValueError, "every"):
+            _ = tracing.Sampler(0)